@@ -11,5 +11,29 @@ class Settings:
     # ML Model settings
     DEFAULT_LSTM_EPOCHS = 30
     DEFAULT_TIME_STEP = 60
+    DEFAULT_BATCH_SIZE = 32
+    MAX_BATCH_SIZE = 512
+    EARLY_STOPPING_PATIENCE = 5
+    
+    # Wall-clock training budget (seconds) per difficulty level
+    TRAINING_TIME_BUDGETS = {
+        'basic': float(os.getenv("TRAINING_BUDGET_BASIC", 20)),
+        'intermediate': float(os.getenv("TRAINING_BUDGET_INTERMEDIATE", 45)),
+        'advanced': float(os.getenv("TRAINING_BUDGET_ADVANCED", 90)),
+    }
+    
+    # Incremental fine-tuning of stored models
+    MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", "model_store")
+    MODEL_LINEAGE_LIMIT = 50
+    FINE_TUNE_EPOCHS = 3
+    FINE_TUNE_LEARNING_RATE = 1e-4
+    FINE_TUNE_REPLAY_SAMPLES = 64
+    MAX_INCREMENTAL_BARS = 20
+    SCALER_DRIFT_TOLERANCE = 0.0  # fraction of the fitted price range allowed outside it
+    
+    # Feature store for multivariate LSTM inputs
+    FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "feature_store")
+    FEATURE_LOOKBACK = 100
+    DEFAULT_FEATURES = [f.strip() for f in os.getenv("LSTM_FEATURES", "close").split(",") if f.strip()]
     
 settings = Settings()
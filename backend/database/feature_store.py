@@ -0,0 +1,123 @@
+# Precomputed per-ticker feature cache feeding multivariate LSTM inputs
+import os
+import logging
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from database.ml_utils import calculate_rsi, calculate_moving_average, calculate_ema, calculate_volatility
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['Close', 'Volume']
+
+# Each feature is a vectorized function of the raw price frame
+FEATURE_FUNCTIONS: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    'close': lambda df: df['Close'],
+    'return': lambda df: df['Close'].pct_change(),
+    'log_return': lambda df: np.log(df['Close']).diff(),
+    'rsi_14': lambda df: calculate_rsi(df['Close'], 14) / 100,
+    'sma_ratio_10': lambda df: df['Close'] / calculate_moving_average(df['Close'], 10) - 1,
+    'sma_ratio_20': lambda df: df['Close'] / calculate_moving_average(df['Close'], 20) - 1,
+    'ema_ratio_12': lambda df: df['Close'] / calculate_ema(df['Close'], 12) - 1,
+    'ema_ratio_26': lambda df: df['Close'] / calculate_ema(df['Close'], 26) - 1,
+    'volatility_20': lambda df: calculate_volatility(df['Close'].pct_change(), 20),
+    'volume_change': lambda df: df['Volume'].pct_change(),
+    'volume_ratio_20': lambda df: df['Volume'] / calculate_moving_average(df['Volume'], 20),
+}
+
+
+def unknown_features(features: List[str]) -> List[str]:
+    """Return the requested feature names that have no implementation"""
+    return sorted(set(features) - set(FEATURE_FUNCTIONS))
+
+
+# Fail at startup rather than on every request when LSTM_FEATURES has a typo
+if unknown_features(settings.DEFAULT_FEATURES):
+    raise ValueError(
+        f"LSTM_FEATURES contains unknown features: {', '.join(unknown_features(settings.DEFAULT_FEATURES))}. "
+        f"Available: {', '.join(FEATURE_FUNCTIONS)}"
+    )
+
+
+class FeatureStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.FEATURE_STORE_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    def _cache_path(self, ticker: str, interval: str) -> str:
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, f"{ticker.upper()}_{interval}.pkl"))
+        # Tickers come from requests, so never let them escape the store directory
+        if os.path.dirname(path) != root:
+            raise ValueError(f"Invalid feature cache key for {ticker!r}/{interval!r}")
+        return path
+
+    @staticmethod
+    def compute_features(prices: pd.DataFrame, features: List[str]) -> pd.DataFrame:
+        """Compute the requested feature columns in a single vectorized pass"""
+        columns = {name: FEATURE_FUNCTIONS[name](prices) for name in features}
+        frame = pd.DataFrame(columns, index=prices.index)
+        return frame.replace([np.inf, -np.inf], np.nan).astype(np.float32)
+
+    def load(self, ticker: str, interval: str) -> Optional[pd.DataFrame]:
+        """Load cached prices and features for a ticker/interval"""
+        try:
+            return pd.read_pickle(self._cache_path(ticker, interval))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading feature cache for {ticker}: {e}")
+            return None
+
+    def _save(self, ticker: str, interval: str, frame: pd.DataFrame):
+        path = self._cache_path(ticker, interval)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{id(frame)}"
+        try:
+            frame.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error saving feature cache for {ticker}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def update(self, ticker: str, interval: str, prices: pd.DataFrame, features: List[str]) -> pd.DataFrame:
+        """Bring the cache up to date with the given prices, computing only new rows when possible"""
+        prices = prices[PRICE_COLUMNS]
+        cached = self.load(ticker, interval)
+
+        if cached is not None and not cached.empty:
+            cached_features = [c for c in cached.columns if c not in PRICE_COLUMNS]
+            last_bar = cached.index[-1]
+            reusable = (
+                set(features) <= set(cached_features) and
+                prices.index[0] >= cached.index[0] and
+                last_bar in prices.index and
+                np.isclose(prices.at[last_bar, 'Close'], cached.at[last_bar, 'Close'])
+            )
+            if reusable:
+                new_prices = prices[prices.index > last_bar]
+                if new_prices.empty:
+                    return cached
+
+                # Rolling features only need a short tail of history; EMAs are warm
+                # enough after FEATURE_LOOKBACK bars to match a full recompute closely.
+                tail = pd.concat([cached[PRICE_COLUMNS].iloc[-settings.FEATURE_LOOKBACK:], new_prices])
+                new_features = self.compute_features(tail, cached_features).loc[new_prices.index]
+                frame = pd.concat([cached, pd.concat([new_prices, new_features], axis=1)])
+                self._save(ticker, interval, frame)
+                return frame
+
+            # Recompute everything (adjusted history or new feature set), keeping known features
+            features = list(dict.fromkeys(cached_features + list(features)))
+
+        frame = pd.concat([prices, self.compute_features(prices, features)], axis=1)
+        self._save(ticker, interval, frame)
+        return frame
+
+    def matrix(self, ticker: str, interval: str, prices: pd.DataFrame, features: List[str]) -> np.ndarray:
+        """Return a contiguous (time, features) float32 matrix aligned to the price index"""
+        frame = self.update(ticker, interval, prices, features)
+        return np.ascontiguousarray(frame.loc[prices.index, features].to_numpy(dtype=np.float32))
@@ -22,3 +22,11 @@ def normalize_data(data: np.ndarray) -> Tuple[np.ndarray, float, float]:
     max_val = np.max(data)
     normalized = (data - min_val) / (max_val - min_val)
     return normalized, min_val, max_val
+
+def calculate_ema(prices: pd.Series, span: int) -> pd.Series:
+    """Calculate exponential moving average"""
+    return prices.ewm(span=span, adjust=False).mean()
+
+def calculate_volatility(returns: pd.Series, window: int = 20) -> pd.Series:
+    """Calculate rolling volatility of returns"""
+    return returns.rolling(window=window).std()
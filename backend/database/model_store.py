@@ -0,0 +1,100 @@
+# Local persistence for trained models, fitted scalers and their lineage
+import os
+import json
+import shutil
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+from tensorflow.keras.models import load_model
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.MODEL_STORE_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    def _model_dir(self, ticker: str, period: str, difficulty: str) -> str:
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, f"{ticker.upper()}_{period}_{difficulty}"))
+        # Keys come from request fields, so never let them escape the store directory
+        if os.path.dirname(path) != root:
+            raise ValueError(f"Invalid model key for {ticker!r}/{period!r}/{difficulty!r}")
+        return path
+
+    def load_metadata(self, ticker: str, period: str, difficulty: str) -> Optional[Dict[str, Any]]:
+        """Load stored metadata (last bar, model id, lineage) for a ticker"""
+        path = os.path.join(self._model_dir(ticker, period, difficulty), "metadata.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading model metadata for {ticker}: {e}")
+            return None
+
+    def load(self, ticker: str, period: str, difficulty: str) -> Optional[Tuple[Any, Any, Dict[str, Any]]]:
+        """Load the last trained model, fitted scaler and metadata for a ticker"""
+        metadata = self.load_metadata(ticker, period, difficulty)
+        if metadata is None:
+            return None
+        model_dir = self._model_dir(ticker, period, difficulty)
+        try:
+            model = load_model(os.path.join(model_dir, "model.keras"))
+            scaler = joblib.load(os.path.join(model_dir, "scaler.joblib"))
+            return model, scaler, metadata
+        except Exception as e:
+            logger.error(f"Error loading stored model for {ticker}: {e}")
+            return None
+
+    def save(
+        self,
+        ticker: str,
+        period: str,
+        difficulty: str,
+        model,
+        scaler,
+        last_bar: str,
+        lineage_entry: Dict[str, Any],
+        features: Optional[List[str]] = None
+    ) -> bool:
+        """Persist model, scaler and append a lineage entry for this refresh"""
+        model_dir = self._model_dir(ticker, period, difficulty)
+        tmp_dir = f"{model_dir}.tmp-{os.getpid()}-{id(model)}"
+        try:
+            previous = self.load_metadata(ticker, period, difficulty) or {}
+            lineage = previous.get("lineage", []) + [lineage_entry]
+            metadata = {
+                "ticker": ticker.upper(),
+                "period": period,
+                "difficulty": difficulty,
+                "model_id": lineage_entry["model_id"],
+                "last_bar": last_bar,
+                "features": features or ['close'],
+                "updated_at": datetime.utcnow().isoformat(),
+                "lineage": lineage[-settings.MODEL_LINEAGE_LIMIT:]
+            }
+
+            # Write into a scratch directory and swap it in so readers never see a partial model
+            os.makedirs(tmp_dir, exist_ok=True)
+            model.save(os.path.join(tmp_dir, "model.keras"))
+            joblib.dump(scaler, os.path.join(tmp_dir, "scaler.joblib"))
+            with open(os.path.join(tmp_dir, "metadata.json"), "w") as f:
+                json.dump(metadata, f, indent=2)
+
+            old_dir = f"{model_dir}.old-{os.getpid()}-{id(model)}"
+            if os.path.exists(model_dir):
+                os.replace(model_dir, old_dir)
+            os.replace(tmp_dir, model_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving model for {ticker}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
@@ -0,0 +1,31 @@
+# Serve main.app with yfinance pointed at the local market-data stand-in
+import argparse
+import os
+import sys
+
+import uvicorn
+import yfinance as yf
+
+
+def redirect_yfinance(base_url: str, cache_dir: str):
+    """Rewrite the Yahoo endpoints every loaded yfinance module captured at import time"""
+    for name, module in list(sys.modules.items()):
+        if not name.startswith('yfinance'):
+            continue
+        for attr in ('_BASE_URL_', '_ROOT_URL_'):
+            if hasattr(module, attr):
+                setattr(module, attr, base_url)
+    if hasattr(yf, 'set_tz_cache_location'):
+        yf.set_tz_cache_location(cache_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API against local stand-in services")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    redirect_yfinance(os.environ["LOADTEST_MARKET_DATA_URL"], os.environ["LOADTEST_CACHE_DIR"])
+
+    from main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
@@ -0,0 +1,162 @@
+# Yahoo Finance chart API stand-in serving recorded CSV bars or deterministic synthetic ones
+import csv
+import json
+import logging
+import math
+import os
+import random
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+RANGE_DAYS = {
+    '1d': 1, '5d': 5, '1mo': 31, '3mo': 92, '6mo': 183,
+    '1y': 365, '2y': 730, '5y': 1826, '10y': 3652, 'ytd': 366, 'max': 3652,
+}
+
+Bar = Tuple[int, float, float, float, float, int]  # timestamp, open, high, low, close, volume
+
+
+class FakeMarketDataServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        end_date: date,
+        recorded_dir: Optional[str] = None,
+        history_days: int = 3652
+    ):
+        super().__init__(address, FakeChartHandler)
+        self.end_date = end_date
+        self.recorded_dir = recorded_dir
+        self.history_days = history_days
+        self._bars: Dict[str, List[Bar]] = {}
+
+    def bars(self, symbol: str) -> List[Bar]:
+        """Return the full daily bar history for a symbol, loading or generating it once"""
+        if symbol not in self._bars:
+            recorded = self._load_recorded(symbol) if self.recorded_dir else None
+            self._bars[symbol] = recorded if recorded is not None else self._synthetic(symbol)
+        return self._bars[symbol]
+
+    def _load_recorded(self, symbol: str) -> Optional[List[Bar]]:
+        path = os.path.join(self.recorded_dir, f"{symbol.upper()}.csv")
+        if not os.path.exists(path):
+            return None
+        bars = []
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                day = datetime.fromisoformat(row['Date'][:10]).replace(hour=13, minute=30, tzinfo=timezone.utc)
+                bars.append((
+                    int(day.timestamp()),
+                    float(row['Open']), float(row['High']), float(row['Low']), float(row['Close']),
+                    int(float(row.get('Volume') or 0))
+                ))
+        return bars
+
+    def _synthetic(self, symbol: str) -> List[Bar]:
+        """Geometric random walk seeded by the symbol and anchored to end_date so every run sees the same bars"""
+        rng = random.Random(zlib.crc32(symbol.upper().encode()))
+        last_day = datetime(self.end_date.year, self.end_date.month, self.end_date.day, 13, 30, tzinfo=timezone.utc)
+        price = 20 + rng.random() * 480
+        bars = []
+        for offset in range(self.history_days, -1, -1):
+            day = last_day - timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            open_price = price
+            price = max(1.0, price * math.exp(rng.gauss(0.0003, 0.018)))
+            high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.005)))
+            low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.005)))
+            bars.append((int(day.timestamp()), open_price, high, low, price, int(rng.uniform(5e5, 5e7))))
+        return bars
+
+
+class FakeChartHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, status: int, body, content_type: str = 'application/json'):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        # Drain any request body so it cannot leak into the next keep-alive request
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        parts = urlsplit(self.path)
+        if parts.path.endswith('/getcrumb'):
+            return self._send(200, b'loadtest-crumb', 'text/plain')
+        if '/finance/chart/' not in parts.path:
+            return self._send(200, b'', 'text/plain')
+
+        symbol = parts.path.rsplit('/', 1)[-1].upper()
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        bars = self.server.bars(symbol)
+        if not bars:
+            return self._send(404, {"chart": {"result": None, "error": {"code": "Not Found", "description": "No data found"}}})
+
+        if 'period1' in query:
+            start = int(float(query['period1']))
+            end = int(float(query.get('period2', bars[-1][0] + 1)))
+        else:
+            end = bars[-1][0] + 1
+            start = end - RANGE_DAYS.get(query.get('range', '1mo'), 31) * 86400
+        selected = [b for b in bars if start <= b[0] < end]
+        self._send(200, chart_payload(symbol, selected, bars[-1], query.get('range', '1mo')))
+
+
+def chart_payload(symbol: str, bars: List[Bar], last: Bar, data_range: str) -> dict:
+    """Build a v8 chart response in the shape yfinance parses"""
+    timestamps = [b[0] for b in bars]
+    closes = [round(b[4], 4) for b in bars]
+    session_start = last[0]
+    trading_period = {"timezone": "EST", "start": session_start, "end": session_start + 23400, "gmtoffset": -18000}
+    return {
+        "chart": {
+            "result": [{
+                "meta": {
+                    "currency": "USD",
+                    "symbol": symbol,
+                    "exchangeName": "NMS",
+                    "instrumentType": "EQUITY",
+                    "firstTradeDate": timestamps[0] if timestamps else session_start,
+                    "regularMarketTime": session_start + 23400,
+                    "gmtoffset": -18000,
+                    "timezone": "EST",
+                    "exchangeTimezoneName": "America/New_York",
+                    "regularMarketPrice": round(last[4], 4),
+                    "chartPreviousClose": closes[0] if closes else round(last[4], 4),
+                    "priceHint": 2,
+                    "currentTradingPeriod": {"pre": trading_period, "regular": trading_period, "post": trading_period},
+                    "dataGranularity": "1d",
+                    "range": data_range,
+                    "validRanges": list(RANGE_DAYS),
+                },
+                "timestamp": timestamps,
+                "indicators": {
+                    "quote": [{
+                        "open": [round(b[1], 4) for b in bars],
+                        "high": [round(b[2], 4) for b in bars],
+                        "low": [round(b[3], 4) for b in bars],
+                        "close": closes,
+                        "volume": [b[5] for b in bars],
+                    }],
+                    "adjclose": [{"adjclose": closes}],
+                },
+            }],
+            "error": None,
+        }
+    }
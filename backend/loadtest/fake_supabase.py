@@ -0,0 +1,153 @@
+# Minimal in-memory PostgREST stand-in for the Supabase tables the backend uses
+import json
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    'eq': lambda a, b: str(a) == b,
+    'neq': lambda a, b: str(a) != b,
+    'gt': lambda a, b: a is not None and str(a) > b,
+    'gte': lambda a, b: a is not None and str(a) >= b,
+    'lt': lambda a, b: a is not None and str(a) < b,
+    'lte': lambda a, b: a is not None and str(a) <= b,
+}
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'columns', 'on_conflict'}
+
+
+class FakeSupabaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int]):
+        super().__init__(address, FakePostgRESTHandler)
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def seed_results(self, user_ids: List[str], tickers: List[str], rows_per_user: int):
+        """Populate prediction_results so history and dashboard queries have data"""
+        now = datetime.utcnow()
+        rows = self.tables.setdefault('prediction_results', [])
+        for user_id in user_ids:
+            for i in range(rows_per_user):
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "ticker": tickers[i % len(tickers)],
+                    "prediction_type": "lstm",
+                    "prediction_data": {"total_return": (i % 7 - 3) * 0.5},
+                    "performance_metrics": None,
+                    "created_at": (now - timedelta(days=i % 45, minutes=i)).isoformat()
+                })
+
+
+class FakePostgRESTHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _parse(self) -> Tuple[str, List[Tuple[str, str]]]:
+        # Always consume the body (postgrest-py sends `{}` even on GET), otherwise
+        # it is read as the start of the next request on a keep-alive connection
+        length = int(self.headers.get('Content-Length') or 0)
+        self._raw_body = self.rfile.read(length) if length else b''
+        parts = urlsplit(self.path)
+        path = parts.path
+        if not path.startswith('/rest/v1/'):
+            return '', []
+        return path[len('/rest/v1/'):].strip('/'), parse_qsl(parts.query, keep_blank_values=True)
+
+    def _send(self, status: int, body: Any, headers: Dict[str, str] = None):
+        payload = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self) -> Any:
+        return json.loads(self._raw_body or b'null')
+
+    def _matches(self, row: Dict[str, Any], params: List[Tuple[str, str]]) -> bool:
+        for column, expression in params:
+            if column in RESERVED_PARAMS:
+                continue
+            operator, _, value = expression.partition('.')
+            if operator in OPERATORS and not OPERATORS[operator](row.get(column), value):
+                return False
+        return True
+
+    def _wants_representation(self) -> bool:
+        return 'return=representation' in (self.headers.get('Prefer') or '')
+
+    def do_GET(self):
+        table, params = self._parse()
+        if not table:
+            return self._send(404, {"message": "Not found"})
+        with self.server.lock:
+            rows = [dict(r) for r in self.server.tables.get(table, []) if self._matches(r, params)]
+        query = dict(params)
+
+        if 'order' in query:
+            for clause in reversed(query['order'].split(',')):
+                column, _, direction = clause.partition('.')
+                rows.sort(key=lambda r: str(r.get(column) or ''), reverse=direction.startswith('desc'))
+
+        # postgrest-py pages either through a Range header or offset/limit params
+        start, end = 0, len(rows) - 1
+        if self.headers.get('Range'):
+            first, _, last = self.headers['Range'].partition('-')
+            start, end = int(first), int(last) if last else end
+        if 'offset' in query:
+            start = int(query['offset'])
+        if 'limit' in query:
+            end = start + int(query['limit']) - 1
+        total = len(rows)
+        rows = rows[start:end + 1]
+        content_range = f"{start}-{start + len(rows) - 1}/{total}" if rows else f"*/{total}"
+        self._send(200, rows, {'Content-Range': content_range})
+
+    def do_POST(self):
+        table, _ = self._parse()
+        if not table:
+            return self._send(404, {"message": "Not found"})
+        body = self._read_body()
+        rows = body if isinstance(body, list) else [body]
+        with self.server.lock:
+            self.server.tables.setdefault(table, []).extend(dict(r) for r in rows)
+        self._send(201, rows if self._wants_representation() else [])
+
+    def do_PATCH(self):
+        table, params = self._parse()
+        body = self._read_body() or {}
+        with self.server.lock:
+            updated = [r for r in self.server.tables.get(table, []) if self._matches(r, params)]
+            for row in updated:
+                row.update(body)
+            updated = [dict(r) for r in updated]
+        self._send(200, updated if self._wants_representation() else [])
+
+    def do_DELETE(self):
+        table, params = self._parse()
+        with self.server.lock:
+            rows = self.server.tables.get(table, [])
+            deleted = [r for r in rows if self._matches(r, params)]
+            self.server.tables[table] = [r for r in rows if not self._matches(r, params)]
+        self._send(200, deleted if self._wants_representation() else [])
+
+    def do_HEAD(self):
+        table, params = self._parse()
+        with self.server.lock:
+            total = sum(1 for r in self.server.tables.get(table, []) if self._matches(r, params))
+        self.send_response(200)
+        self.send_header('Content-Range', f"*/{total}")
+        self.send_header('Content-Length', '0')
+        self.end_headers()
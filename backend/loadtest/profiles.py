@@ -0,0 +1,42 @@
+# Traffic profiles: weighted mixes of the API operations the frontend issues
+import random
+from typing import Any, Dict, List, Tuple
+
+OPERATIONS = ['predict', 'backtest', 'history', 'dashboard_stats', 'save_result']
+
+PROFILES: Dict[str, Dict[str, int]] = {
+    'mixed': {'predict': 1, 'backtest': 2, 'history': 4, 'dashboard_stats': 3, 'save_result': 2},
+    'read_heavy': {'history': 6, 'dashboard_stats': 4},
+    'predict': {'predict': 1},
+    'backtest': {'backtest': 1},
+    'history': {'history': 1},
+    'dashboard_stats': {'dashboard_stats': 1},
+    'save_result': {'save_result': 1},
+}
+
+
+def build_request(operation: str, rng: random.Random, tickers: List[str], user_ids: List[str]) -> Tuple[str, str, Any]:
+    """Return (method, path, json body) for one operation"""
+    ticker = rng.choice(tickers)
+    user_id = rng.choice(user_ids)
+    if operation == 'predict':
+        return 'POST', '/api/predict', {"ticker": ticker, "period": "1y", "forecast_days": 5, "difficulty": "basic"}
+    if operation == 'backtest':
+        return 'POST', '/api/backtest', {"ticker": ticker, "period": "1y", "initial_capital": 10000}
+    if operation == 'history':
+        return 'GET', f'/api/history/{user_id}?limit=10&offset={rng.randrange(3) * 10}', None
+    if operation == 'dashboard_stats':
+        return 'GET', f'/api/dashboard-stats/{user_id}', None
+    if operation == 'save_result':
+        return 'POST', '/api/save-result', {
+            "user_id": user_id,
+            "ticker": ticker,
+            "prediction_type": "lstm",
+            "prediction_data": {"total_return": round(rng.uniform(-5, 5), 3)}
+        }
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def choose_operation(profile: Dict[str, int], rng: random.Random) -> str:
+    operations = list(profile)
+    return rng.choices(operations, weights=[profile[op] for op in operations])[0]
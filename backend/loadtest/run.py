@@ -0,0 +1,391 @@
+"""Load-test the API against local stand-ins for Supabase and Yahoo Finance.
+
+Run from the backend directory:
+
+    python -m loadtest.run --profiles mixed,history --concurrency 1,8,32 --duration 30
+
+Each (profile, concurrency) scenario reports throughput, latency percentiles,
+error rates and backend CPU/RSS. The JSON report is stable across runs so it
+can be diffed between commits; pass --baseline to print deltas in the
+Markdown summary.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import psutil
+
+from loadtest.fake_market_data import FakeMarketDataServer
+from loadtest.fake_supabase import FakeSupabaseServer
+from loadtest.profiles import PROFILES, build_request, choose_operation
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Sample = Tuple[str, float, str]  # operation, latency seconds, status code or error name
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(q / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class ResourceSampler:
+    """Track CPU time and peak RSS of the backend process tree during a scenario"""
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _tree(self) -> List[psutil.Process]:
+        return [self.process] + self.process.children(recursive=True)
+
+    def cpu_seconds(self) -> float:
+        total = 0.0
+        for proc in self._tree():
+            try:
+                times = proc.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                pass
+        return total
+
+    def _sample_rss(self):
+        rss = 0
+        for proc in self._tree():
+            try:
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample_rss()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_cpu = self.cpu_seconds()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample_rss()
+        self.used_cpu = self.cpu_seconds() - self.start_cpu
+
+
+async def run_scenario(
+    base_url: str,
+    profile: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    tickers: List[str],
+    user_ids: List[str],
+    seed: int,
+    timeout: float
+) -> Tuple[List[Sample], float]:
+    """Drive closed-loop traffic with `concurrency` workers for `duration` seconds"""
+    samples: List[Sample] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        deadline = time.monotonic() + duration
+
+        async def worker(index: int):
+            rng = random.Random(seed * 1000 + index)
+            while time.monotonic() < deadline:
+                operation = choose_operation(profile, rng)
+                method, path, body = build_request(operation, rng, tickers, user_ids)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                samples.append((operation, time.perf_counter() - start, status))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        return samples, time.perf_counter() - started
+
+
+def summarize_latencies(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(s[1] * 1000 for s in samples)
+    statuses = Counter(s[2] for s in samples)
+    errors = sum(count for status, count in statuses.items() if not status.startswith(('2', '3')))
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "status_codes": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+
+
+def summarize(samples: List[Sample], elapsed: float, sampler: ResourceSampler) -> Dict[str, Any]:
+    summary = summarize_latencies(samples, elapsed)
+    by_operation = defaultdict(list)
+    for sample in samples:
+        by_operation[sample[0]].append(sample)
+    summary["operations"] = {op: summarize_latencies(ops, elapsed) for op, ops in sorted(by_operation.items())}
+    summary["elapsed_seconds"] = round(elapsed, 2)
+    summary["cpu_seconds"] = round(sampler.used_cpu, 2)
+    summary["cpu_percent"] = round(sampler.used_cpu / elapsed * 100, 1) if elapsed > 0 else 0.0
+    summary["rss_mb_peak"] = round(sampler.peak_rss / 2 ** 20, 1)
+    return summary
+
+
+def start_backend(port: int, env: Dict[str, str], startup_timeout: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "loadtest.app_bootstrap", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Backend did not become healthy in time")
+
+
+def smoke_check(base_url: str, operations: List[str], tickers: List[str], user_ids: List[str], timeout: float):
+    """Send one request per operation and abort on any non-2xx, so a broken stand-in never yields a report"""
+    rng = random.Random(0)
+    for operation in operations:
+        method, path, body = build_request(operation, rng, tickers, user_ids)
+        response = httpx.request(method, f"{base_url}{path}", json=body, timeout=timeout)
+        if not 200 <= response.status_code < 300:
+            raise RuntimeError(
+                f"Smoke check failed for {operation} ({method} {path}): "
+                f"{response.status_code} {response.text[:200]}"
+            )
+        logger.info(f"Smoke check {operation}: {response.status_code}")
+
+
+def render_markdown(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    previous = {}
+    if baseline:
+        previous = {(s["profile"], s["concurrency"]): s for s in baseline.get("scenarios", [])}
+
+    lines = [
+        f"# Load test report ({report['meta']['commit']})",
+        "",
+        "| profile | conc | rps | p50 ms | p95 ms | p99 ms | errors | cpu % | rss MB |" + (" Δ rps | Δ p95 |" if baseline else ""),
+        "|---|---|---|---|---|---|---|---|---|" + ("---|---|" if baseline else ""),
+    ]
+    for s in report["scenarios"]:
+        row = (
+            f"| {s['profile']} | {s['concurrency']} | {s['throughput_rps']} | {s['latency_ms']['p50']} "
+            f"| {s['latency_ms']['p95']} | {s['latency_ms']['p99']} | {s['error_rate'] * 100:.2f}% "
+            f"| {s['cpu_percent']} | {s['rss_mb_peak']} |"
+        )
+        if baseline:
+            old = previous.get((s["profile"], s["concurrency"]))
+            if old:
+                row += f" {relative_change(old['throughput_rps'], s['throughput_rps'])} "
+                row += f"| {relative_change(old['latency_ms']['p95'], s['latency_ms']['p95'])} |"
+            else:
+                row += " n/a | n/a |"
+        lines.append(row)
+    return "\n".join(lines) + "\n"
+
+
+def relative_change(old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against local stand-in services")
+    parser.add_argument("--profiles", default="mixed", help=f"Comma-separated profiles: {', '.join(PROFILES)}")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per scenario")
+    parser.add_argument("--tickers", default="AAPL,MSFT,GOOG,AMZN")
+    parser.add_argument("--users", type=int, default=20, help="Number of distinct user ids")
+    parser.add_argument("--seed-rows", type=int, default=25, help="Saved results pre-seeded per user")
+    parser.add_argument("--market-data-dir", help="Directory of recorded <TICKER>.csv bars; synthetic if omitted")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2025, 12, 31),
+                        help="Last synthetic bar (YYYY-MM-DD); keep fixed to compare reports across commits")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip training a model per ticker before measuring")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest_report", help="Report path prefix (.json and .md are written)")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = [p for p in profiles if p not in PROFILES]
+    if unknown:
+        parser.error(f"Unknown profiles: {', '.join(unknown)}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    user_ids = [f"loadtest-user-{i}" for i in range(args.users)]
+
+    workdir = tempfile.mkdtemp(prefix="stockvision-loadtest-")
+    supabase = market = backend = None
+    try:
+        # Start serving right after construction so shutdown() in finally never blocks
+        supabase = FakeSupabaseServer(("127.0.0.1", free_port()))
+        serve_in_thread(supabase)
+        supabase.seed_results(user_ids, tickers, args.seed_rows)
+        market = FakeMarketDataServer(
+            ("127.0.0.1", free_port()), end_date=args.end_date, recorded_dir=args.market_data_dir
+        )
+        serve_in_thread(market)
+
+        env = dict(os.environ)
+        env.update({
+            "SUPABASE_URL": f"http://127.0.0.1:{supabase.server_address[1]}",
+            # supabase-py rejects keys that are not shaped like a JWT
+            "SUPABASE_ANON_KEY": "loadtest.anon.key",
+            "ENVIRONMENT": "loadtest",
+            "MODEL_STORE_DIR": os.path.join(workdir, "model_store"),
+            "FEATURE_STORE_DIR": os.path.join(workdir, "feature_store"),
+            "LOADTEST_MARKET_DATA_URL": f"http://127.0.0.1:{market.server_address[1]}",
+            "LOADTEST_CACHE_DIR": os.path.join(workdir, "yfinance_cache"),
+        })
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        backend = start_backend(port, env, args.startup_timeout)
+
+        warmup_seconds = 0.0
+        if not args.no_warmup:
+            # Train and store one model per ticker so predict scenarios measure steady state
+            started = time.perf_counter()
+            for ticker in tickers:
+                response = httpx.post(
+                    f"{base_url}/api/predict",
+                    json={"ticker": ticker, "period": "1y", "forecast_days": 5, "difficulty": "basic"},
+                    timeout=args.timeout,
+                )
+                if not 200 <= response.status_code < 300:
+                    raise RuntimeError(f"Warmup predict for {ticker} failed: {response.status_code} {response.text[:200]}")
+                logger.info(f"Warmup predict {ticker}: {response.status_code}")
+            warmup_seconds = time.perf_counter() - started
+
+        operations = sorted({op for name in profiles for op in PROFILES[name]})
+        smoke_check(base_url, operations, tickers, user_ids, args.timeout)
+
+        scenarios = []
+        for profile_name in profiles:
+            for concurrency in levels:
+                logger.info(f"Running {profile_name} at concurrency {concurrency} for {args.duration}s")
+                with ResourceSampler(backend.pid) as sampler:
+                    samples, elapsed = asyncio.run(run_scenario(
+                        base_url, PROFILES[profile_name], concurrency, args.duration,
+                        tickers, user_ids, args.seed, args.timeout
+                    ))
+                scenario = {"profile": profile_name, "concurrency": concurrency}
+                scenario.update(summarize(samples, elapsed, sampler))
+                scenarios.append(scenario)
+                logger.info(
+                    f"{profile_name}@{concurrency}: {scenario['throughput_rps']} rps, "
+                    f"p95 {scenario['latency_ms']['p95']} ms, errors {scenario['error_rate'] * 100:.2f}%"
+                )
+    finally:
+        if backend is not None:
+            backend.terminate()
+            try:
+                backend.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                backend.kill()
+        for server in (supabase, market):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "generated_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "duration_seconds": args.duration,
+            "tickers": tickers,
+            "users": args.users,
+            "market_data": "recorded" if args.market_data_dir else "synthetic",
+            "end_date": args.end_date.isoformat(),
+            "warmup_seconds": round(warmup_seconds, 2),
+            "seed": args.seed,
+        },
+        "scenarios": scenarios,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    with open(f"{args.output}.json", "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    markdown = render_markdown(report, baseline)
+    with open(f"{args.output}.md", "w") as f:
+        f.write(markdown)
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 class PredictionRequest(BaseModel):
     ticker: str
-    period: str = "1y"
+    period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"] = "1y"
     forecast_days: int = 5
-    difficulty: str = "basic"
+    difficulty: Literal["basic", "intermediate", "advanced"] = "basic"
+    batch_size: Optional[int] = None
+    features: Optional[List[str]] = None
 
 class PredictionData(BaseModel):
     date: str
@@ -26,6 +28,9 @@ class PredictionResponse(BaseModel):
     total_return: float
     confidence: float
     history: List[HistoricalPrice]
+    epochs_run: Optional[int] = None
+    training_seconds: Optional[float] = None
+    training_mode: Optional[str] = None
     success: bool = True
     message: str = "Prediction completed successfully"
 
@@ -2,13 +2,22 @@ import yfinance as yf
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
+from numpy.lib.stride_tricks import sliding_window_view
+import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.callbacks import Callback, EarlyStopping
+from tensorflow.keras.optimizers import Adam
 import requests  # <-- ADD THIS IMPORT
 import os
+import time
 import logging
 import warnings
+from datetime import datetime
 from typing import Optional, Dict, Any, List
+from config import settings
+from database.model_store import ModelStore
+from database.feature_store import FeatureStore
 
 # --- Setup Logging and Warnings ---
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow info messages
@@ -18,10 +27,44 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class TimeBudget(Callback):
+    """Stop training once the wall-clock budget for the request is spent"""
+    def __init__(self, budget_seconds: float):
+        super().__init__()
+        self.budget_seconds = budget_seconds
+        self.start_time = None
+        self.exhausted = False
+
+    def on_train_begin(self, logs=None):
+        self.start_time = time.monotonic()
+
+    def on_epoch_end(self, epoch, logs=None):
+        if time.monotonic() - self.start_time >= self.budget_seconds:
+            self.exhausted = True
+            self.model.stop_training = True
+
+
 class StockPredictor:
     def __init__(self):
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.model = None
+        self.training_stats = {"epochs_run": 0, "training_seconds": 0.0, "best_loss": None}
+        self._model_store = None
+        self._feature_store = None
+        self.features = ['close']
+
+    @property
+    def model_store(self) -> ModelStore:
+        # Created on first use so backtests never touch the filesystem
+        if self._model_store is None:
+            self._model_store = ModelStore()
+        return self._model_store
+
+    @property
+    def feature_store(self) -> FeatureStore:
+        if self._feature_store is None:
+            self._feature_store = FeatureStore()
+        return self._feature_store
         
     def fetch_stock_data(self, ticker: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
         """Fetch stock data from Yahoo Finance"""
@@ -40,7 +83,7 @@ class StockPredictor:
                 logger.error(f"No data found for {ticker}")
                 return pd.DataFrame()
                 
-            data = data[['Close']].dropna()
+            data = data[['Close', 'Volume']].dropna()
             
             if len(data) < 100:
                 logger.error(f"Insufficient data for {ticker} (only {len(data)} records)")
@@ -55,40 +98,222 @@ class StockPredictor:
             logger.error(f"Error fetching data for {ticker}: {e}")
             return pd.DataFrame()
 
-    def prepare_data(self, data: pd.DataFrame, time_step: int = 60) -> tuple:
+    def model_inputs(self, ticker: str, data: pd.DataFrame, interval: str = '1d') -> tuple:
+        """Select the LSTM input matrix for the active feature set.
+        
+        Returns the (possibly trimmed) price frame and a (time, features) matrix whose
+        first column is always the close price.
+        """
+        if self.features == ['close']:
+            return data, data[['Close']].to_numpy(dtype=np.float32)
+        
+        inputs = self.feature_store.matrix(ticker, interval, data, self.features)
+        
+        # Drop the warm-up rows of the rolling indicators
+        valid = np.isfinite(inputs).all(axis=1)
+        start = int(np.argmax(valid)) if valid.any() else len(inputs)
+        inputs = np.nan_to_num(inputs[start:], copy=False)
+        return data.iloc[start:], inputs
+
+    def prepare_data(
+        self,
+        data: pd.DataFrame,
+        time_step: int = 60,
+        fit_scaler: bool = True,
+        inputs: Optional[np.ndarray] = None
+    ) -> tuple:
         """Prepare data for LSTM training"""
         try:
-            scaled_data = self.scaler.fit_transform(data[['Close']])
-            X, y = [], []
-            returns = data['Return'].values
+            if inputs is None:
+                inputs = data[['Close']].to_numpy(dtype=np.float32)
+            if fit_scaler:
+                scaled_data = self.scaler.fit_transform(inputs)
+            else:
+                scaled_data = self.scaler.transform(inputs)
+            scaled_data = np.ascontiguousarray(scaled_data, dtype=np.float32)
+            returns = data['Return'].to_numpy(dtype=np.float32)
             
-            for i in range(time_step, len(scaled_data) - 1):
-                X.append(scaled_data[i - time_step:i, 0])
-                y.append(returns[i + 1])
-                
-            X, y = np.array(X), np.array(y)
-            X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+            # Window i covers rows [i, i + time_step) and predicts the return two bars later
+            n_windows = len(scaled_data) - time_step - 1
+            if n_windows <= 0:
+                return np.array([]), np.array([])
+            X = sliding_window_view(scaled_data, time_step, axis=0)[:n_windows].transpose(0, 2, 1)
+            y = returns[time_step + 1:]
             return X, y
         except Exception as e:
             logger.error(f"Error preparing data: {e}")
             return np.array([]), np.array([])
 
-    def train_lstm_model(self, X_train: np.ndarray, y_train: np.ndarray, epochs: int = 30):
-        """Train LSTM model"""
+    def make_dataset(self, X: np.ndarray, y: np.ndarray, batch_size: int, shuffle: bool = False) -> tf.data.Dataset:
+        """Build a batched, prefetched float32 tf.data pipeline"""
+        dataset = tf.data.Dataset.from_tensor_slices((X.astype(np.float32, copy=False), y.astype(np.float32, copy=False)))
+        if shuffle:
+            dataset = dataset.shuffle(len(X), reshuffle_each_iteration=True)
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+    def train_lstm_model(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: Optional[np.ndarray] = None,
+        y_val: Optional[np.ndarray] = None,
+        epochs: int = 30,
+        batch_size: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ):
+        """Train LSTM model with early stopping on the held-out test windows"""
         try:
+            batch_size = batch_size or settings.DEFAULT_BATCH_SIZE
+            
             model = Sequential()
-            model.add(LSTM(64, return_sequences=True, input_shape=(X_train.shape[1], 1)))
+            model.add(LSTM(64, return_sequences=True, input_shape=(X_train.shape[1], X_train.shape[2])))
             model.add(LSTM(64))
             model.add(Dense(1))
             model.compile(optimizer='adam', loss='mean_squared_error')
             
-            logger.info(f"Training LSTM model with {len(X_train)} samples")
-            model.fit(X_train, y_train, epochs=epochs, batch_size=32, verbose=0)
+            val_size = len(X_val) if X_val is not None else 0
+            if val_size >= 1:
+                val_dataset = self.make_dataset(X_val, y_val, batch_size)
+                monitor = 'val_loss'
+            else:
+                val_dataset = None
+                monitor = 'loss'
+            
+            early_stopping = EarlyStopping(
+                monitor=monitor,
+                patience=settings.EARLY_STOPPING_PATIENCE,
+                restore_best_weights=True
+            )
+            callbacks = [early_stopping]
+            budget = TimeBudget(time_budget) if time_budget else None
+            if budget is not None:
+                callbacks.append(budget)
+            
+            logger.info(f"Training LSTM model with {len(X_train)} samples ({val_size} validation)")
+            start = time.monotonic()
+            history = model.fit(
+                self.make_dataset(X_train, y_train, batch_size, shuffle=True),
+                validation_data=val_dataset,
+                epochs=epochs,
+                callbacks=callbacks,
+                verbose=0
+            )
+            training_seconds = time.monotonic() - start
+            
+            # EarlyStopping only restores weights when it triggers itself
+            if early_stopping.stopped_epoch == 0 and early_stopping.best_weights is not None:
+                model.set_weights(early_stopping.best_weights)
+            
+            epochs_run = len(history.history.get('loss', []))
+            self.training_stats = {
+                "epochs_run": epochs_run,
+                "training_seconds": round(training_seconds, 3),
+                "best_loss": float(early_stopping.best)
+            }
+            if budget is not None and budget.exhausted:
+                logger.info(f"Training stopped by {time_budget}s time budget after {epochs_run} epochs")
             return model
         except Exception as e:
             logger.error(f"Error training model: {e}")
             return None
 
+    def scaler_drifted(self, scaler: MinMaxScaler, new_inputs: np.ndarray) -> bool:
+        """Check whether new prices fall outside the range the scaler was fitted on.
+        
+        Only the close column (always first) is checked: indicator columns such as
+        RSI or volume ratios hit new extremes routinely without the price level moving.
+        """
+        data_min, data_max = float(scaler.data_min_[0]), float(scaler.data_max_[0])
+        tolerance = (data_max - data_min) * settings.SCALER_DRIFT_TOLERANCE
+        closes = new_inputs[:, 0]
+        return bool(closes.max() > data_max + tolerance or closes.min() < data_min - tolerance)
+
+    def refresh_model(
+        self,
+        ticker: str,
+        data: pd.DataFrame,
+        inputs: np.ndarray,
+        period: str,
+        difficulty: str,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Fine-tune the stored model on newly appended bars.
+        
+        Returns the lineage entry of the refresh, or a dict with only a "reason"
+        key when a full retrain is required instead.
+        """
+        stored = self.model_store.load(ticker, period, difficulty)
+        if stored is None:
+            return {"reason": "no_base_model"}
+        model, scaler, metadata = stored
+        if metadata.get('features', ['close']) != self.features:
+            return {"reason": "feature_set_changed"}
+        
+        new_mask = data.index > pd.Timestamp(metadata['last_bar'])
+        bars_added = int(new_mask.sum())
+        if bars_added > settings.MAX_INCREMENTAL_BARS:
+            logger.info(f"{bars_added} new bars for {ticker}, falling back to full retrain")
+            return {"reason": "too_many_new_bars"}
+        if bars_added > 0 and self.scaler_drifted(scaler, inputs[new_mask]):
+            logger.info(f"Scaler drift detected for {ticker}, falling back to full retrain")
+            return {"reason": "scaler_drift"}
+        
+        self.model, self.scaler = model, scaler
+        if bars_added == 0:
+            self.training_stats = {"epochs_run": 0, "training_seconds": 0.0, "best_loss": None}
+            return {"mode": "cached", "model_id": metadata['model_id'], "bars_added": 0}
+        
+        X, y = self.prepare_data(data, fit_scaler=False, inputs=inputs)
+        if len(X) <= bars_added:
+            return {"reason": "insufficient_history"}
+        
+        # Newly appended windows plus a small replay sample of older ones
+        X_new, y_new = X[-bars_added:], y[-bars_added:]
+        replay_count = min(settings.FINE_TUNE_REPLAY_SAMPLES, len(X) - bars_added)
+        replay_idx = np.random.default_rng().choice(len(X) - bars_added, size=replay_count, replace=False)
+        X_tune = np.concatenate([X_new, X[replay_idx]])
+        y_tune = np.concatenate([y_new, y[replay_idx]])
+        
+        batch_size = batch_size or settings.DEFAULT_BATCH_SIZE
+        new_dataset = self.make_dataset(X_new, y_new, batch_size)
+        
+        self.model.compile(optimizer=Adam(learning_rate=settings.FINE_TUNE_LEARNING_RATE), loss='mean_squared_error')
+        loss_before = float(self.model.evaluate(new_dataset, verbose=0))
+        
+        logger.info(f"Fine-tuning {ticker} model on {bars_added} new windows + {replay_count} replay samples")
+        start = time.monotonic()
+        history = self.model.fit(
+            self.make_dataset(X_tune, y_tune, batch_size, shuffle=True),
+            epochs=settings.FINE_TUNE_EPOCHS,
+            verbose=0
+        )
+        training_seconds = time.monotonic() - start
+        loss_after = float(self.model.evaluate(new_dataset, verbose=0))
+        
+        self.training_stats = {
+            "epochs_run": len(history.history.get('loss', [])),
+            "training_seconds": round(training_seconds, 3),
+            "best_loss": loss_after
+        }
+        lineage_entry = {
+            "model_id": self.new_model_id(ticker, period, difficulty),
+            "base_model": metadata['model_id'],
+            "mode": "incremental",
+            "bars_added": bars_added,
+            "loss_before": loss_before,
+            "loss_after": loss_after,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        self.model_store.save(
+            ticker, period, difficulty, self.model, self.scaler,
+            data.index[-1].isoformat(), lineage_entry, features=self.features
+        )
+        return lineage_entry
+
+    def new_model_id(self, ticker: str, period: str, difficulty: str) -> str:
+        """Build a unique identifier for a stored model version"""
+        return f"{ticker.upper()}-{period}-{difficulty}-{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
+
     def generate_signals(self, returns: List[float], threshold: float = 0.002) -> List[str]:
         """Generate trading signals based on predicted returns"""
         signals = []
@@ -101,41 +326,86 @@ class StockPredictor:
                 signals.append("Hold")
         return signals
 
-    def predict(self, ticker: str, period: str = '1y', forecast_days: int = 5, difficulty: str = 'basic') -> Optional[Dict[str, Any]]:
+    def predict(
+        self,
+        ticker: str,
+        period: str = '1y',
+        forecast_days: int = 5,
+        difficulty: str = 'basic',
+        batch_size: Optional[int] = None,
+        features: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Main prediction function"""
         try:
             # Adjust parameters based on difficulty
             epochs = {'basic': 20, 'intermediate': 30, 'advanced': 50}.get(difficulty, 30)
             threshold = {'basic': 0.005, 'intermediate': 0.002, 'advanced': 0.001}.get(difficulty, 0.002)
+            time_budget = settings.TRAINING_TIME_BUDGETS.get(difficulty, settings.TRAINING_TIME_BUDGETS['intermediate'])
             
             # Fetch data
             data = self.fetch_stock_data(ticker, period)
             if data.empty:
                 logger.error(f"No data available for {ticker}")
                 return None
+            
+            # 'close' always leads so the scaler and forecast loop can find the price column
+            features = features or settings.DEFAULT_FEATURES
+            self.features = list(dict.fromkeys(['close'] + list(features)))
+            
+            # model_data drops indicator warm-up rows; data stays whole for the response history
+            model_data, inputs = self.model_inputs(ticker, data)
                 
-            # Prepare and train
-            X, y = self.prepare_data(data)
-            if len(X) == 0:
-                logger.error("No training data available after preparation")
-                return None
+            # Reuse the stored model when only a few new bars have arrived
+            refresh = self.refresh_model(ticker, model_data, inputs, period, difficulty, batch_size=batch_size)
+            if "reason" not in refresh:
+                training_mode = refresh["mode"]
+                X, _ = self.prepare_data(model_data, fit_scaler=False, inputs=inputs)
+                current_input = X[-1:]
+            else:
+                training_mode = "full"
                 
-            train_size = int(len(X) * 0.8)
-            if train_size < 10:
-                logger.error("Insufficient training data")
-                return None
+                # Prepare and train
+                X, y = self.prepare_data(model_data, inputs=inputs)
+                if len(X) == 0:
+                    logger.error("No training data available after preparation")
+                    return None
+                    
+                train_size = int(len(X) * 0.8)
+                if train_size < 10:
+                    logger.error("Insufficient training data")
+                    return None
+                    
+                X_train, X_test = X[:train_size], X[train_size:]
+                y_train, y_test = y[:train_size], y[train_size:]
                 
-            X_train, X_test = X[:train_size], X[train_size:]
-            y_train = y[:train_size]
-            
-            self.model = self.train_lstm_model(X_train, y_train, epochs=epochs)
-            if self.model is None:
-                return None
+                self.model = self.train_lstm_model(
+                    X_train, y_train,
+                    X_val=X_test, y_val=y_test,
+                    epochs=epochs,
+                    batch_size=batch_size,
+                    time_budget=time_budget
+                )
+                if self.model is None:
+                    return None
+                
+                base = self.model_store.load_metadata(ticker, period, difficulty)
+                self.model_store.save(ticker, period, difficulty, self.model, self.scaler, data.index[-1].isoformat(), {
+                    "model_id": self.new_model_id(ticker, period, difficulty),
+                    "base_model": base['model_id'] if base else None,
+                    "mode": "full",
+                    "reason": refresh["reason"],
+                    "bars_added": len(model_data),
+                    "loss_before": None,
+                    "loss_after": self.training_stats["best_loss"],
+                    "created_at": datetime.utcnow().isoformat()
+                }, features=self.features)
+                
+                current_input = X_train[-1:] if len(X_test) == 0 else X_test[-1:]
             
             # Generate predictions
-            current_input = X_train[-1:] if len(X_test) == 0 else X_test[-1:]
             forecast_returns = []
             last_price = data['Close'].values[-1]
+            price_tail = data[['Close', 'Volume']].iloc[-settings.FEATURE_LOOKBACK:].copy()
             
             for i in range(forecast_days):
                 predicted_return = self.model.predict(current_input, verbose=0)[0, 0]
@@ -143,8 +413,14 @@ class StockPredictor:
                 next_price = last_price * (1 + predicted_return)
                 last_price = next_price
                 
-                scaled_next_price = self.scaler.transform([[next_price]])[0, 0]
-                current_input = np.append(current_input[:, 1:, :], [[[scaled_next_price]]], axis=1)
+                if self.features == ['close']:
+                    next_row = [[next_price]]
+                else:
+                    # Recompute indicators over the recent tail with the forecast bar appended
+                    price_tail.loc[price_tail.index[-1] + pd.Timedelta(days=1)] = [next_price, price_tail['Volume'].iloc[-1]]
+                    next_row = np.nan_to_num(self.feature_store.compute_features(price_tail, self.features).to_numpy()[-1:])
+                scaled_next = self.scaler.transform(next_row).astype(np.float32)
+                current_input = np.append(current_input[:, 1:, :], scaled_next[np.newaxis], axis=1)
             
             # Generate signals and results
             signals = self.generate_signals(forecast_returns, threshold=threshold)
@@ -179,6 +455,9 @@ class StockPredictor:
                 "signals": signals,
                 "total_return": round(total_return, 4),
                 "confidence": round(confidence, 3),
+                "epochs_run": self.training_stats["epochs_run"],
+                "training_seconds": self.training_stats["training_seconds"],
+                "training_mode": training_mode,
                 "history": [
                     {
                         "date": idx.strftime('%Y-%m-%d'),
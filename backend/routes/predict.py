@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from models.data_models import PredictionRequest, PredictionResponse
 from models.ml_models import StockPredictor
+from database.feature_store import unknown_features
+from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,12 +21,21 @@ async def predict_stock(request: PredictionRequest):
         if request.forecast_days < 1 or request.forecast_days > 30:
             raise HTTPException(status_code=400, detail="Forecast days must be between 1 and 30")
         
+        if request.batch_size is not None and not 1 <= request.batch_size <= settings.MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"Batch size must be between 1 and {settings.MAX_BATCH_SIZE}")
+        
+        unknown = unknown_features(request.features or [])
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown features: {', '.join(unknown)}")
+        
         predictor = StockPredictor()
         result = predictor.predict(
             ticker=request.ticker.upper(),
             period=request.period,
             forecast_days=request.forecast_days,
-            difficulty=request.difficulty
+            difficulty=request.difficulty,
+            batch_size=request.batch_size,
+            features=request.features
         )
         
         if result is None: